@@ -1,8 +1,10 @@
 import argparse
 import asyncio
+import fcntl
 import logging
 import os
 import subprocess
+import threading
 from typing import Optional
 
 import discord
@@ -14,6 +16,24 @@ logging.basicConfig(
 logging.getLogger("discord.ext.voice_recv.reader").setLevel(logging.WARNING)
 log = logging.getLogger(__name__)
 
+# 100ms of 48kHz stereo s16le PCM (9600 frames * 2 channels * 2 bytes)
+PCM_FLUSH_BYTES = 19200
+# Kernel pipe capacity requested for audio pipes (~5s of 48kHz stereo s16le)
+PIPE_BUFFER_BYTES = 1 << 20
+
+
+def set_pipe_size(fd: int, size: int = PIPE_BUFFER_BYTES):
+    """Enlarges the kernel buffer of a pipe so producer stalls are absorbed.
+
+    Only supported on Linux; elsewhere this is a no-op.
+    """
+    if not hasattr(fcntl, "F_SETPIPE_SZ"):
+        return
+    try:
+        fcntl.fcntl(fd, fcntl.F_SETPIPE_SZ, size)
+    except OSError as e:
+        log.warning(f"Could not resize pipe buffer: {e}")
+
 
 class DiscordIntercom:
     def __init__(
@@ -28,6 +48,9 @@ class DiscordIntercom:
         self.input_path = input_path
         self.output_path = output_path
         self.encoder_process = None
+        self._pcm_buf = bytearray()
+        # save_audio runs on voice_recv's thread while cleanup runs on the loop
+        self._pcm_lock = threading.Lock()
         self.bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
 
         try:
@@ -59,7 +82,7 @@ class DiscordIntercom:
                 log.info("Playback started...")
 
             if self.output_path:
-                self._start_mp3_encoder()
+                self._start_encoder()
                 voice_client.listen(voice_recv.BasicSink(self.save_audio))
                 log.info("Recording started...")
 
@@ -67,13 +90,18 @@ class DiscordIntercom:
             log.exception("An error occurred during voice operations.")
             await self.cleanup()
 
-    def _start_mp3_encoder(self):
-        """Starts an ffmpeg process to encode raw PCM to MP3 in real-time.
+    def _start_encoder(self):
+        """Starts an ffmpeg process to encode raw PCM in real-time.
 
         Input: Raw PCM, Signed 16-bit Little Endian, 48000Hz, Stereo
-        Output: MP3, 192k bitrate
+        Output: Opus 96k for .ogg/.opus paths, otherwise MP3 192k
         """
         log.info(f"Streaming recording to: {self.output_path}")
+        if self.output_path.lower().endswith((".ogg", ".opus")):
+            # Opus is much cheaper to encode than LAME and matches Discord's codec
+            codec = ["-acodec", "libopus", "-b:a", "96k"]
+        else:
+            codec = ["-acodec", "libmp3lame", "-b:a", "192k"]
         command = [
             "ffmpeg",
             "-y",
@@ -85,10 +113,7 @@ class DiscordIntercom:
             "2",
             "-i",
             "pipe:0",
-            "-acodec",
-            "libmp3lame",
-            "-b:a",
-            "192k",
+            *codec,
             self.output_path,
         ]
 
@@ -96,16 +121,36 @@ class DiscordIntercom:
         self.encoder_process = subprocess.Popen(
             command, stdin=subprocess.PIPE, stderr=subprocess.DEVNULL
         )
+        # A larger pipe keeps the voice receive thread from blocking on ffmpeg
+        set_pipe_size(self.encoder_process.stdin.fileno())
 
     def save_audio(self, user, data):
-        """Pipes received PCM data directly to the ffmpeg encoder."""
+        """Buffers received PCM data and pipes it to the ffmpeg encoder.
+
+        Packets arrive every 20ms, so they are batched into ~100ms writes to
+        cut down on pipe syscalls from the voice receive thread.
+        """
         if not user:
             return
-        if self.encoder_process and self.encoder_process.stdin:
+        with self._pcm_lock:
+            self._pcm_buf += data.pcm
+            if len(self._pcm_buf) >= PCM_FLUSH_BYTES:
+                self._flush_pcm()
+
+    def _flush_pcm(self):
+        """Writes any buffered PCM data to the ffmpeg encoder.
+
+        Callers must hold self._pcm_lock.
+        """
+        if not self._pcm_buf:
+            return
+        stdin = self.encoder_process.stdin if self.encoder_process else None
+        if stdin and not stdin.closed:
             try:
-                self.encoder_process.stdin.write(data.pcm)
+                stdin.write(self._pcm_buf)
             except BrokenPipeError:
                 log.error("FFmpeg process died unexpectedly.")
+        self._pcm_buf.clear()
 
     async def _play_audio(self, voice_client):
         """Plays audio from the specified input file."""
@@ -117,27 +162,46 @@ class DiscordIntercom:
         retry_attempts = 10
         for attempt in range(retry_attempts):
             try:
-                ffmpeg_options = None
                 if self.input_path.lower().endswith((".mp3", ".wav")):
-                    pass
-                else:
-                    if not self.input_path.lower().endswith(".pcm"):
-                        log.warning(
-                            "Unknown input format. Defaulting to raw PCM assumptions."
-                        )
-                    ffmpeg_options = "-f s16le -ar 48000 -ac 2"
-                source = discord.FFmpegPCMAudio(
-                    self.input_path,
-                    before_options=ffmpeg_options,
-                )
-                voice_client.play(source)
-
-                while voice_client.is_playing():
-                    await asyncio.sleep(1)
+                    source = discord.FFmpegPCMAudio(self.input_path)
+                    await self._play_and_wait(voice_client, source)
+                    continue
+
+                if not self.input_path.lower().endswith(".pcm"):
+                    log.warning(
+                        "Unknown input format. Defaulting to raw PCM assumptions."
+                    )
+                if not os.path.isfile(self.input_path):
+                    # Opening a FIFO blocks until a writer appears; leave that to
+                    # an ffmpeg process, which a shutdown can still interrupt.
+                    source = discord.FFmpegPCMAudio(
+                        self.input_path,
+                        before_options="-f s16le -ar 48000 -ac 2",
+                    )
+                    await self._play_and_wait(voice_client, source)
+                    continue
+
+                # Raw s16le/48kHz/stereo is already Discord's native format, so
+                # stream regular files without an ffmpeg process.
+                with open(self.input_path, "rb") as pcm_file:
+                    source = discord.PCMAudio(pcm_file)
+                    await self._play_and_wait(voice_client, source)
             except Exception as e:
                 log.error(f"Playback error on attempt {attempt + 1}: {e}")
                 await asyncio.sleep(1)
 
+    async def _play_and_wait(self, voice_client, source):
+        """Plays a source and waits for the player's completion callback."""
+        done = asyncio.Event()
+
+        def after_playing(error):
+            if error:
+                log.error(f"Player error: {error}")
+            self.bot.loop.call_soon_threadsafe(done.set)
+
+        voice_client.play(source, after=after_playing)
+        await done.wait()
+
     def _drain_fifo(self):
         """Reads and discards all data currently in the pipe buffer."""
         log.debug("Draining pipe to sync with tail...")
@@ -166,10 +230,12 @@ class DiscordIntercom:
         log.info("Cleaning up resources...")
 
         if self.encoder_process:
-            if self.encoder_process.stdin:
-                self.encoder_process.stdin.close()
+            with self._pcm_lock:
+                self._flush_pcm()
+                if self.encoder_process.stdin:
+                    self.encoder_process.stdin.close()
             self.encoder_process.wait()
-            log.info("MP3 encoding finished.")
+            log.info("Recording encoding finished.")
 
         if self.bot:
             await self.bot.close()
@@ -186,7 +252,7 @@ def main():
     if not token:
         raise ValueError("DISCORD_BOT_TOKEN environment variable is required.")
 
-    parser = argparse.ArgumentParser(description="Discord MP3 Recorder & Speaker")
+    parser = argparse.ArgumentParser(description="Discord Audio Recorder & Speaker")
     parser.add_argument("--channel-id", type=int, required=True)
     parser.add_argument("--input", type=str, default=None)
     parser.add_argument("--output", type=str, default=None)
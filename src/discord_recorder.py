@@ -1,6 +1,7 @@
 import argparse
 import logging
 import os
+import threading
 
 import discord
 from discord.ext import commands, voice_recv
@@ -15,6 +16,9 @@ class DiscordRecorder:
         self.token = token
         self.channel_id = channel_id
         self.output_path = output_path
+        self.output_file = None
+        # save_audio runs on voice_recv's thread while cleanup runs on ours
+        self._output_lock = threading.Lock()
         self.bot = commands.Bot(command_prefix="!", intents=discord.Intents.default())
         # load Opus library
         discord.opus.load_opus("/opt/homebrew/lib/libopus.dylib")
@@ -32,18 +36,32 @@ class DiscordRecorder:
 
         voice_client = await channel.connect(cls=voice_recv.VoiceRecvClient)
         log.info(f"Connected to Voice Channel: {channel.name} ({channel.id})")
+        self.output_file = open(self.output_path, "ab")
         voice_client.listen(voice_recv.BasicSink(self.save_audio))
         log.info(f"Recording audio to: {self.output_path}")
 
     def save_audio(self, user, data):
         if not user:
             return
-        with open(self.output_path, "ab") as f:
-            log.info(f"Writing audio data for user {user.name}")
-            f.write(data.pcm)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Writing %d bytes of audio for user %s", len(data.pcm), user.name)
+        with self._output_lock:
+            output_file = self.output_file
+            if output_file:
+                output_file.write(data.pcm)
+
+    def cleanup(self):
+        """Closes the output file, flushing any buffered audio."""
+        with self._output_lock:
+            if self.output_file:
+                self.output_file.close()
+                self.output_file = None
 
     def start(self):
-        self.bot.run(self.token)
+        try:
+            self.bot.run(self.token)
+        finally:
+            self.cleanup()
 
 
 if __name__ == "__main__":
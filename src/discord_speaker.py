@@ -78,22 +78,48 @@ class DiscordSpeaker:
             audio_setting = "-f mp3"
         elif self.input_path.endswith(".wav"):
             audio_setting = "-f wav"
-        elif self.input_path.endswith(".pcm"):
-            audio_setting = "-f s16le -ar 48000 -ac 2"
-        else:
+        elif not self.input_path.endswith(".pcm"):
             log.warning("Unknown file extension. Defaulting to raw PCM settings.")
-            audio_setting = "-f s16le -ar 48000 -ac 2"
-        source = discord.FFmpegPCMAudio(self.input_path, options=audio_setting)
-
-        voice_client.play(source)
 
-        log.debug("Playback started. Waiting for audio to finish.")
-        while voice_client.is_playing():
-            await asyncio.sleep(1)
+        if audio_setting:
+            source = discord.FFmpegPCMAudio(self.input_path, options=audio_setting)
+            await self._play_and_wait(voice_client, source)
+        elif not os.path.isfile(self.input_path):
+            # Opening a FIFO blocks until a writer appears; leave that to an
+            # ffmpeg process, which a shutdown can still interrupt.
+            source = discord.FFmpegPCMAudio(
+                self.input_path, before_options="-f s16le -ar 48000 -ac 2"
+            )
+            await self._play_and_wait(voice_client, source)
+        else:
+            # Raw s16le/48kHz/stereo is Discord's native format; skip ffmpeg
+            with open(self.input_path, "rb") as pcm_file:
+                await self._play_and_wait(voice_client, discord.PCMAudio(pcm_file))
 
         log.info("Playback finished.")
         await voice_client.disconnect()
 
+    async def _play_and_wait(
+        self, voice_client: discord.VoiceClient, source: discord.AudioSource
+    ):
+        """Plays a source and waits for the player's completion callback.
+
+        Args:
+            voice_client (discord.VoiceClient): The connected voice client instance.
+            source (discord.AudioSource): The audio source to play.
+        """
+        done = asyncio.Event()
+
+        def after_playing(error):
+            if error:
+                log.error(f"Player error: {error}")
+            self.bot.loop.call_soon_threadsafe(done.set)
+
+        voice_client.play(source, after=after_playing)
+
+        log.debug("Playback started. Waiting for audio to finish.")
+        await done.wait()
+
     def start(self):
         """Starts the bot client."""
         self.bot.run(self.token)
@@ -1,22 +1,26 @@
 import argparse
+import fcntl
 import logging
 import os
+import shlex
 import signal
 import subprocess
 import sys
 from dataclasses import dataclass
 from pathlib import Path
 
-import discord_intercom
-
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(name)s:%(lineno)d - %(message)s",
 )
 log = logging.getLogger(__name__)
 
+# Largest FIFO buffer an unprivileged process can request by default
+# (/proc/sys/fs/pipe-max-size); F_SETPIPE_SZ fails with EPERM above it.
+FIFO_MAX_BYTES = 1 << 20
+
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class VlcConfig:
     source: str
     pipe: str
@@ -27,6 +31,28 @@ class VlcConfig:
     verbose: bool
 
 
+def _build_sout(volume: float, pipe: str, mute_local: bool) -> str:
+    """Builds the VLC 'sout' chain that transcodes audio into the pipe.
+
+    This handles muxing to raw PCM, optional gain filtering, and audio routing
+    (duplicate vs single stream).
+    """
+
+    # Define the transcode segment: PCM s16l, 48kHz, Stereo
+    gain = f",afilter=gain{{gain={volume}}}" if volume != 1.0 else ""
+    transcode = (
+        f"transcode{{acodec=s16l,channels=2,samplerate=48000{gain}}}:"
+        f"std{{access=file,mux=raw,dst={pipe}}}"
+    )
+
+    # Routing: Duplicate to speakers unless mute_local is toggled
+    return (
+        f"#duplicate{{dst=display,dst=\"{transcode}\"}}"
+        if not mute_local
+        else f"#{transcode}"
+    )
+
+
 class DiscordVlcStreamer:
     """Orchestrates VLC streaming into a Discord Bot via a named pipe."""
 
@@ -37,40 +63,27 @@ class DiscordVlcStreamer:
         self.channel_id = channel_id
         self.vlc_config = vlc_config
         self.vlc_process = None
+        self.fifo_fd = None
         self.bot = None
         self.vlc_bin = vlc_bin
 
-    def build_vlc_command(self, config: VlcConfig) -> str:
-        """Constructs the shell command to launch VLC based on config parameters.
+    def build_vlc_command(self, config: VlcConfig) -> list[str]:
+        """Constructs the argv list to launch VLC based on config parameters."""
 
-        This function handles the 'sout' chain logic, including muxing to raw PCM,
-        optional gain filtering, and audio routing (duplicate vs single stream).
-        """
-
-        # Define the transcode segment: PCM s16l, 48kHz, Stereo
-        gain = f",afilter=gain{{gain={config.volume}}}" if config.volume != 1.0 else ""
-        transcode = (
-            f"transcode{{acodec=s16l,channels=2,samplerate=48000{gain}}}:"
-            f"std{{access=file,mux=raw,dst={config.pipe}}}"
-        )
-
-        # Routing: Duplicate to speakers unless mute_local is toggled
-        sout = (
-            f"'#duplicate{{dst=display,dst=\"{transcode}\"}}'"
-            if not config.mute_local
-            else f"'#{transcode}'"
-        )
+        sout = _build_sout(config.volume, config.pipe, config.mute_local)
         # Assemble command arguments
-        cmd = [
-            self.vlc_bin,
-            "-I dummy" if config.headless else "",
-            f"{config.source}" if config.source else "",
+        cmd = [self.vlc_bin]
+        if config.headless:
+            cmd += ["-I", "dummy"]
+        if config.source:
+            cmd.append(config.source)
+        cmd += [
             f"--file-caching={config.latency}",
             f"--network-caching={config.latency}",
             f"--verbose={1 if config.verbose else 0}",
             f"--sout={sout}",
         ]
-        return " ".join(filter(None, cmd))
+        return cmd
 
     def setup_fifo(self):
         """Creates a named pipe (FIFO) if it doesn't exist.
@@ -91,15 +104,28 @@ class DiscordVlcStreamer:
             log.error(f"Failed to create FIFO: {e}")
             sys.exit(1)
 
+        if not hasattr(fcntl, "F_SETPIPE_SZ"):
+            return
+        # The kernel frees a pipe's buffer once every end is closed, so hold a
+        # read-only handle for our lifetime to keep the enlarged capacity. It
+        # must not be a write end, or the bot's reader would never see EOF.
+        # Size it to the configured latency (48kHz stereo s16le = 192 B/ms),
+        # between the 64 KiB Linux default and the unprivileged maximum.
+        self.fifo_fd = os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+        pipe_size = min(max(self.vlc_config.latency * 192, 65536), FIFO_MAX_BYTES)
+        try:
+            fcntl.fcntl(self.fifo_fd, fcntl.F_SETPIPE_SZ, pipe_size)
+        except OSError as e:
+            log.warning(f"Could not resize FIFO buffer: {e}")
+
     def launch_vlc(self):
         """Generates the command and launches VLC as a subprocess."""
-        cmd_str = self.build_vlc_command(self.vlc_config)
+        cmd = self.build_vlc_command(self.vlc_config)
         log.info("Launching VLC...")
-        log.debug(f"VLC Command: {cmd_str}")
+        log.debug(f"VLC Command: {shlex.join(cmd)}")
 
         self.vlc_process = subprocess.Popen(
-            cmd_str,
-            shell=True,
+            cmd,
             preexec_fn=os.setsid,
             stdout=subprocess.DEVNULL if not self.vlc_config.verbose else None,
             stderr=subprocess.DEVNULL if not self.vlc_config.verbose else None,
@@ -107,6 +133,9 @@ class DiscordVlcStreamer:
 
     def run(self):
         """Main method to run the VLC to Discord streaming."""
+        # Deferred so CLI parsing doesn't pay for importing discord.py
+        import discord_intercom
+
         try:
             self.setup_fifo()
             self.launch_vlc()
@@ -133,6 +162,9 @@ class DiscordVlcStreamer:
                 pass
             except Exception as e:
                 log.error(f"Error killing VLC: {e}")
+        if self.fifo_fd is not None:
+            os.close(self.fifo_fd)
+            self.fifo_fd = None
         if os.path.exists(self.vlc_config.pipe):
             os.unlink(self.vlc_config.pipe)
 